@@ -1,27 +1,219 @@
 from typing import List, Dict, Any, Tuple
+import numpy as np
 from loguru import logger
+from scipy.optimize import linear_sum_assignment
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; greedy matching falls back to NumPy.
+    njit = None
+
+try:
+    import faiss
+except ImportError:  # faiss is optional; top-K search falls back to chunked NumPy.
+    faiss = None
 from models import OpenSCAPRule, DetailItemLynis, SuggestionItemLynis
 from text_utils import (
     create_text_for_openscap,
     create_text_for_detail,
     create_text_for_suggestion,
 )
-from embedding_utils import get_embedding, cosine_similarity
+from embedding_utils import get_embeddings, save_embedding_cache
+
+SIMILARITY_THRESHOLD = 0.5
+# Beyond this many rule/candidate scores (~200 MB of float32) the dense similarity
+# matrix is not built; each rule only considers its TOP_K_CANDIDATES best candidates.
+DENSE_SIMILARITY_MAX_ENTRIES = 50_000_000
+TOP_K_CANDIDATES = 10
+
+
+def _greedy_kernel_numpy(
+    sim_matrix: np.ndarray, threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy pairing with vectorized row scans, used when Numba is not installed.
+    """
+    n_rules, n_cand = sim_matrix.shape
+    best_idx = np.full(n_rules, -1, dtype=np.int64)
+    best_sim = np.zeros(n_rules, dtype=np.float32)
+    available = np.ones(n_cand, dtype=np.bool_)
+    for i in range(n_rules):
+        if not available.any():
+            break
+        row = np.where(available, sim_matrix[i], -np.inf)
+        j = int(row.argmax())
+        if row[j] > threshold:
+            best_idx[i] = j
+            best_sim[i] = row[j]
+            available[j] = False
+    return best_idx, best_sim
+
+
+def _greedy_kernel_loops(
+    sim_matrix: np.ndarray, threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy pairing written as plain loops for Numba to compile. Each rule depends on the
+    candidates taken by the previous ones, so the rows are processed sequentially.
+    """
+    n_rules, n_cand = sim_matrix.shape
+    best_idx = np.full(n_rules, -1, dtype=np.int64)
+    best_sim = np.zeros(n_rules, dtype=np.float32)
+    available = np.ones(n_cand, dtype=np.bool_)
+    for i in range(n_rules):
+        j_best = -1
+        s_best = threshold
+        for j in range(n_cand):
+            if available[j] and sim_matrix[i, j] > s_best:
+                j_best = j
+                s_best = sim_matrix[i, j]
+        if j_best >= 0:
+            best_idx[i] = j_best
+            best_sim[i] = s_best
+            available[j_best] = False
+    return best_idx, best_sim
+
+
+if njit is not None:
+    _greedy_kernel = njit(cache=True)(_greedy_kernel_loops)
+else:
+    _greedy_kernel = _greedy_kernel_numpy
+
+
+def _greedy_match(
+    sim_matrix: np.ndarray, threshold: float
+) -> Dict[int, Tuple[int, float]]:
+    """
+    Walks the rules in order and pairs each one with the most similar candidate that is
+    still available, provided the similarity exceeds the threshold.
+
+    Returns:
+        dict: {rule index: (candidate index, similarity)} for every paired rule.
+    """
+    best_idx, best_sim = _greedy_kernel(
+        np.ascontiguousarray(sim_matrix, dtype=np.float32), np.float32(threshold)
+    )
+    return {
+        i: (int(j), float(sim))
+        for i, (j, sim) in enumerate(zip(best_idx, best_sim))
+        if j >= 0
+    }
+
+
+def _optimal_match(
+    sim_matrix: np.ndarray, threshold: float
+) -> Dict[int, Tuple[int, float]]:
+    """
+    Solves the pairing as an assignment problem (Hungarian algorithm), maximizing the
+    total similarity of all pairs that exceed the threshold.
+
+    Returns:
+        dict: {rule index: (candidate index, similarity)} for every paired rule.
+    """
+    if sim_matrix.size == 0:
+        return {}
+    # Pairs at or below the threshold are discarded anyway, so they must not pull the
+    # assignment away from pairs that would be kept.
+    gains = np.where(sim_matrix > threshold, sim_matrix, 0.0)
+    rows, cols = linear_sum_assignment(gains, maximize=True)
+    return {
+        int(i): (int(j), float(sim_matrix[i, j]))
+        for i, j in zip(rows, cols)
+        if sim_matrix[i, j] > threshold
+    }
+
+
+def _top_k_candidates(
+    osc_mat: np.ndarray, cand_mat: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the k most similar candidates of every rule without materializing the full
+    similarity matrix, using an exact inner-product faiss index when faiss is installed
+    and blocks of rows otherwise.
+
+    Returns:
+        tuple: (scores, indices), both of shape (n_rules, k) and sorted best first.
+    """
+    k = min(k, cand_mat.shape[0])
+    if faiss is not None:
+        index = faiss.IndexFlatIP(cand_mat.shape[1])
+        index.add(cand_mat)
+        return index.search(osc_mat, k)
+
+    scores = np.empty((osc_mat.shape[0], k), dtype=np.float32)
+    indices = np.empty((osc_mat.shape[0], k), dtype=np.int64)
+    block_rows = max(1, DENSE_SIMILARITY_MAX_ENTRIES // (10 * cand_mat.shape[0]))
+    for start in range(0, osc_mat.shape[0], block_rows):
+        block = osc_mat[start : start + block_rows] @ cand_mat.T
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        scores[start : start + block_rows] = np.take_along_axis(top_scores, order, 1)
+        indices[start : start + block_rows] = np.take_along_axis(top, order, 1)
+    return scores, indices
+
+
+def _greedy_match_top_k(
+    osc_mat: np.ndarray,
+    cand_mat: np.ndarray,
+    scores: np.ndarray,
+    indices: np.ndarray,
+    threshold: float,
+) -> Dict[int, Tuple[int, float]]:
+    """
+    Greedy pairing over per-rule top-K candidate lists: each rule, in order, takes its
+    best listed candidate that is still available and exceeds the threshold. When every
+    listed candidate above the threshold is already taken, the rule is scored against all
+    candidates, so the result matches greedy matching over the dense matrix.
+
+    Returns:
+        dict: {rule index: (candidate index, similarity)} for every paired rule.
+    """
+    matches: Dict[int, Tuple[int, float]] = {}
+    available = np.ones(cand_mat.shape[0], dtype=bool)
+    for i in range(scores.shape[0]):
+        for sim, j in zip(scores[i], indices[i]):
+            if sim <= threshold:
+                break
+            if j >= 0 and available[j]:
+                matches[i] = (int(j), float(sim))
+                available[j] = False
+                break
+        else:
+            # The best free candidate may lie beyond the top K.
+            row = np.where(available, cand_mat @ osc_mat[i], -np.inf)
+            j = int(row.argmax())
+            if row[j] > threshold:
+                matches[i] = (j, float(row[j]))
+                available[j] = False
+    return matches
+
+
+MATCHERS = {
+    "optimal": _optimal_match,
+    "greedy": _greedy_match,
+}
 
 
 def compare_objects(
     openscap_rules: List[OpenSCAPRule],
     detail_items: List[DetailItemLynis],
     suggestion_items: List[SuggestionItemLynis],
+    matching: str = "optimal",
 ) -> Dict[str, Any]:
     """
-    For each OpenSCAP rule, computes the cosine similarity with every candidate from
-    the combined detail and suggestion lists. The candidate with the highest similarity
-    is selected. If the highest similarity exceeds 0.5, the rule and candidate are paired
-    and removed from further comparisons. Otherwise, the rule is marked as unpaired.
+    Computes the cosine similarity of every OpenSCAP rule with every candidate from the
+    combined detail and suggestion lists, and pairs rules with candidates. Each candidate
+    is used at most once, and only pairs whose similarity exceeds 0.5 are kept. Rules
+    without such a pair are marked as unpaired, as are any detail or suggestion items
+    left over.
 
-    After processing all OpenSCAP rules, any remaining detail or suggestion items are also
-    marked as unpaired.
+    Args:
+        matching (str): "optimal" (default) picks the set of pairs with the highest total
+            similarity; "greedy" pairs rules in order with the best remaining candidate.
+            Above DENSE_SIMILARITY_MAX_ENTRIES rule/candidate pairs this is ignored and
+            greedy matching is always used, since the dense similarity matrix needed by
+            the optimal assignment is not built.
 
     Returns:
         dict: {
@@ -31,66 +223,72 @@ def compare_objects(
             "unpaired_suggestion": List of SuggestionItemLynis objects not paired
         }
     """
-    logger.info("Starting pairwise comparisons.")
+    if matching not in MATCHERS:
+        raise ValueError(
+            f"Unknown matching strategy '{matching}'. Expected one of {list(MATCHERS)}."
+        )
+    logger.info(f"Starting pairwise comparisons ({matching} matching).")
 
-    osc_embeddings = [
-        (rule, get_embedding(create_text_for_openscap(rule))) for rule in openscap_rules
-    ]
-    det_embeddings = [
-        (detail, get_embedding(create_text_for_detail(detail)))
-        for detail in detail_items
-    ]
-    sugg_embeddings = [
-        (sugg, get_embedding(create_text_for_suggestion(sugg)))
-        for sugg in suggestion_items
-    ]
+    osc_mat = get_embeddings(
+        [create_text_for_openscap(rule) for rule in openscap_rules], persist=False
+    )
+    det_mat = get_embeddings(
+        [create_text_for_detail(detail) for detail in detail_items], persist=False
+    )
+    sugg_mat = get_embeddings(
+        [create_text_for_suggestion(sugg) for sugg in suggestion_items], persist=False
+    )
+    # The persistent cache is rewritten once for all three lists.
+    save_embedding_cache()
+
+    # Rows of the matrices line up with these object lists; the objects themselves are
+    # only looked up by index once the pairs are known.
+    n_det = len(detail_items)
+    candidates: List[Any] = [*detail_items, *suggestion_items]
+    osc_mat = np.ascontiguousarray(osc_mat, dtype=np.float32)
+    cand_mat = np.ascontiguousarray(np.vstack([det_mat, sugg_mat]), dtype=np.float32)
+    # Embeddings are unit length, so inner products are cosine similarities.
+    if len(openscap_rules) * len(candidates) > DENSE_SIMILARITY_MAX_ENTRIES:
+        logger.warning(
+            f"Too many pairs for a dense similarity matrix; ignoring matching="
+            f"'{matching}' and using greedy matching over the top {TOP_K_CANDIDATES} "
+            f"candidates of each rule."
+        )
+        scores, indices = _top_k_candidates(osc_mat, cand_mat, TOP_K_CANDIDATES)
+        matches = _greedy_match_top_k(
+            osc_mat, cand_mat, scores, indices, SIMILARITY_THRESHOLD
+        )
+    else:
+        sim_matrix = osc_mat @ cand_mat.T
+        matches = MATCHERS[matching](sim_matrix, SIMILARITY_THRESHOLD)
 
     pairs: List[Tuple[Any, Any, float, bool]] = []
     unpaired_osc: List[OpenSCAPRule] = []
+    available = np.ones(len(candidates), dtype=bool)
 
-    remaining_det = det_embeddings.copy()
-    remaining_sugg = sugg_embeddings.copy()
-
-    for rule, emb_rule in osc_embeddings:
-        best_sim = 0.0
-        best_candidate = None
-        best_candidate_type = None
-
-        for detail, emb_det in remaining_det:
-            sim = cosine_similarity(emb_rule, emb_det)
-            if sim > best_sim:
-                best_sim = sim
-                best_candidate = detail
-                best_candidate_type = "detail"
-
-        for sugg, emb_sugg in remaining_sugg:
-            sim = cosine_similarity(emb_rule, emb_sugg)
-            if sim > best_sim:
-                best_sim = sim
-                best_candidate = sugg
-                best_candidate_type = "suggestion"
-
-        if best_sim > 0.5 and best_candidate is not None:
-            pairs.append((rule, best_candidate, best_sim, True))
-            logger.debug(
-                f"Pair found: Rule '{rule.title}' with candidate type '{best_candidate_type}' (sim={best_sim:.3f})"
+    for idx, rule in enumerate(openscap_rules):
+        if idx in matches:
+            best_idx, best_sim = matches[idx]
+            best_candidate_type = "detail" if best_idx < n_det else "suggestion"
+            pairs.append((rule, candidates[best_idx], best_sim, True))
+            logger.opt(lazy=True).debug(
+                "Pair found: Rule '{}' with candidate type '{}' (sim={:.3f})",
+                lambda: rule.title,
+                lambda: best_candidate_type,
+                lambda: best_sim,
             )
-            if best_candidate_type == "detail":
-                remaining_det = [
-                    (d, emb) for (d, emb) in remaining_det if d != best_candidate
-                ]
-            elif best_candidate_type == "suggestion":
-                remaining_sugg = [
-                    (s, emb) for (s, emb) in remaining_sugg if s != best_candidate
-                ]
+            available[best_idx] = False
         else:
             unpaired_osc.append(rule)
-            logger.debug(
-                f"No suitable pair for Rule '{rule.title}' (best sim={best_sim:.3f}). Marking as unpaired."
+            logger.opt(lazy=True).debug(
+                "No suitable pair for Rule '{}'. Marking as unpaired.",
+                lambda: rule.title,
             )
 
-    unpaired_det = [d for (d, emb) in remaining_det]
-    unpaired_sugg = [s for (s, emb) in remaining_sugg]
+    unpaired_det = [det for det, free in zip(detail_items, available[:n_det]) if free]
+    unpaired_sugg = [
+        sugg for sugg, free in zip(suggestion_items, available[n_det:]) if free
+    ]
 
     logger.info("Comparisons completed.")
     return {
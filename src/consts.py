@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent.parent
@@ -7,6 +8,27 @@ OPENSCAP_REPORT = REPORTS_DIR / "openscap-report.json"
 LYNIS_REPORT = REPORTS_DIR / "lynis-report.json"
 GENERATED_DIR = ROOT_DIR / "generated_reports"
 DATABASE_URL = "sqlite:///reports.sqlite"
+DATABASE_ECHO = os.environ.get("DATABASE_ECHO", "").lower() in ("1", "true", "yes")
+EMBEDDING_CACHE_DIR = DATA_DIR / "embeddings.cache"
+EMBEDDING_CACHE_MAX_ENTRIES = 100_000
+EMBEDDING_MEMORY_CACHE_MAX_ENTRIES = 50_000
+# bfloat16 CPU inference is faster only on CPUs with native bf16 (AVX512-BF16/AMX) and
+# shifts similarity scores slightly, so it is opt-in.
+EMBEDDING_CPU_BF16 = os.environ.get("EMBEDDING_CPU_BF16", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# torch.compile the embedding model on CUDA; compiling costs more than it saves for
+# typical audit sizes, so it is opt-in.
+EMBEDDING_TORCH_COMPILE = os.environ.get("EMBEDDING_TORCH_COMPILE", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Worker processes tokenizing ahead of the model; 0 tokenizes in the main process,
+# where the fast tokenizer already parallelizes each batch itself.
+EMBEDDING_NUM_WORKERS = int(os.environ.get("EMBEDDING_NUM_WORKERS", 0))
 
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
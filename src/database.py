@@ -9,21 +9,25 @@ from sqlalchemy import (
     Text,
     Float,
     Boolean,
+    RowMapping,
+    insert,
+    select,
 )
 from sqlalchemy.orm import (
     declarative_base,
     relationship,
     sessionmaker,
     Session,
-    selectinload,
 )
 from datetime import datetime
 from loguru import logger
-from consts import DATABASE_URL
-from typing import Optional, Dict, List, Any
+from consts import DATABASE_URL, DATABASE_ECHO
+from typing import Optional, Dict, List, Any, Tuple
 from models import OpenSCAPRule, DetailItemLynis, SuggestionItemLynis
 
 Base = declarative_base()
+engine = create_engine(DATABASE_URL, echo=DATABASE_ECHO)
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
 class Report(Base):
@@ -83,6 +87,7 @@ class OpenSCAP(Base):
     __table_args__ = (
         Index("idx_openscap_severity", severity),
         Index("idx_openscap_result", result),
+        Index("idx_openscap_report", report_id, title),
     )
 
     def __repr__(self):
@@ -159,6 +164,8 @@ class Lynis(Base):
         Index("idx_lynis_service", service),
         Index("idx_lynis_severity", severity),
         Index("idx_lynis_json_id", lynis_json_id),
+        Index("idx_lynis_type", lynistype_id),
+        Index("idx_lynis_report_jsonid", report_id, lynis_json_id),
     )
 
     def __repr__(self):
@@ -210,6 +217,8 @@ class GeneratedReport(Base):
         doc="True if the pair is verified (cosine similarity > 0.5); False otherwise.",
     )
 
+    __table_args__ = (Index("idx_genrep_report", report_id),)
+
     def __repr__(self):
         return (
             f"<GeneratedReport(id={self.id}, report_id={self.report_id}, "
@@ -217,38 +226,49 @@ class GeneratedReport(Base):
         )
 
 
-def get_db_id_for_openscap(session: Session, rule: OpenSCAPRule) -> Optional[int]:
+def get_db_ids_for_openscap(session: Session, report_id: int) -> Dict[str, int]:
     """
-    Retrieves the database ID for an OpenSCAP record by matching its title.
-    Assumes that the title is unique.
+    Maps the title of every OpenSCAP record in the report to its database ID.
+    Assumes that the title is unique; otherwise the lowest ID wins.
     """
-    db_rule = session.query(OpenSCAP).filter(OpenSCAP.title == rule.title).first()
-    return db_rule.id if db_rule else None
+    rows = (
+        session.query(OpenSCAP.title, OpenSCAP.id)
+        .filter(OpenSCAP.report_id == report_id)
+        .order_by(OpenSCAP.id.desc())
+    )
+    return dict(rows.all())
 
 
-def get_db_id_for_lynis(session: Session, obj: Any) -> Optional[int]:
+def get_db_ids_for_lynis(session: Session, report_id: int) -> Dict[str, int]:
     """
-    Retrieves the database ID for a Lynis record by using the external ID from the Pydantic object.
-    The Pydantic object is expected to have its 'id' attribute (from the JSON) which was stored in the database
-    as lynis_json_id.
+    Maps the external JSON ID of every Lynis record in the report to its database ID.
+    The Pydantic objects carry this external ID in their 'id' attribute, which was stored
+    in the database as lynis_json_id. If the ID repeats, the lowest database ID wins.
     """
-    external_id = getattr(obj, "id", None)
-    if external_id:
-        db_obj = session.query(Lynis).filter(Lynis.lynis_json_id == external_id).first()
-        return db_obj.id if db_obj else None
-    return None
+    rows = (
+        session.query(Lynis.lynis_json_id, Lynis.id)
+        .filter(Lynis.report_id == report_id, Lynis.lynis_json_id.isnot(None))
+        .order_by(Lynis.id.desc())
+    )
+    return dict(rows.all())
 
 
-def init_database(echo: bool = True):
+def init_database(echo: bool = DATABASE_ECHO):
     """
     Initializes the database schema (creates all tables if they don't exist)
     and inserts two default LynisTypes ('details' and 'suggestions').
+
+    The shared module-level engine is used; `echo` toggles its SQL statement logging
+    (defaults to the DATABASE_ECHO environment variable).
     """
     logger.info(f"Initializing database with URL={DATABASE_URL}, echo={echo}")
-    engine = create_engine(DATABASE_URL, echo=echo)
+    engine.echo = echo
     logger.debug("Creating all tables (if they don't exist).")
     Base.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    # create_all skips existing tables entirely, so add indexes introduced since then.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     with SessionLocal() as session:
         logger.debug("Checking existing LynisTypes entries.")
         existing_count = session.query(LynisTypes).count()
@@ -268,55 +288,91 @@ def init_database(echo: bool = True):
         logger.info("Database schema is up-to-date. Initialization complete.")
 
 
+_OPENSCAP_ITEM_COLUMNS = (
+    OpenSCAP.id,
+    OpenSCAP.title,
+    OpenSCAP.severity,
+    OpenSCAP.description,
+    OpenSCAP.rationale,
+    OpenSCAP.result,
+)
+_LYNIS_ITEM_COLUMNS = (
+    Lynis.id,
+    Lynis.lynistype_id,
+    Lynis.lynis_json_id,
+    Lynis.service,
+    Lynis.severity,
+    Lynis.long_description,
+    Lynis.desc,
+    Lynis.value,
+    Lynis.prefval,
+    Lynis.field,
+    LynisTypes.name.label("type_name"),
+)
+
+
+def _row_to_dict(row: RowMapping) -> Dict[str, Any]:
+    """
+    Converts a Core result row into the plain dict returned for a report item.
+    The Lynis 'type_name' key is only present when the item has a LynisTypes entry.
+    """
+    item = dict(row)
+    if "type_name" in item and item["type_name"] is None:
+        del item["type_name"]
+    return item
+
+
 def get_report(session: Session, report_id: int) -> Optional[Dict]:
     """
     Retrieves all information about a single report, including associated OpenSCAP and Lynis items.
+
+    The items are read as plain Core row mappings rather than ORM objects.
     """
-    report = (
-        session.query(Report)
-        .options(
-            selectinload(Report.openscap_items),
-            selectinload(Report.lynis_items).selectinload(Lynis.lynistype),
-        )
-        .filter(Report.id == report_id)
-        .first()
-    )
+    report = session.execute(
+        select(Report.id, Report.date).where(Report.id == report_id)
+    ).first()
     if not report:
         return None
-    report_data = {
+    openscap_rows = session.execute(
+        select(*_OPENSCAP_ITEM_COLUMNS)
+        .where(OpenSCAP.report_id == report_id)
+        .order_by(OpenSCAP.id)
+    ).mappings()
+    lynis_rows = session.execute(
+        select(*_LYNIS_ITEM_COLUMNS)
+        .outerjoin(LynisTypes, Lynis.lynistype_id == LynisTypes.id)
+        .where(Lynis.report_id == report_id)
+        .order_by(Lynis.id)
+    ).mappings()
+    return {
         "report_id": report.id,
         "date": str(report.date),
-        "openscap_items": [],
-        "lynis_items": [],
+        "openscap_items": [_row_to_dict(row) for row in openscap_rows],
+        "lynis_items": [_row_to_dict(row) for row in lynis_rows],
     }
-    for osc in report.openscap_items:
-        report_data["openscap_items"].append(
-            {
-                "id": osc.id,
-                "title": osc.title,
-                "severity": osc.severity,
-                "description": osc.description,
-                "rationale": osc.rationale,
-                "result": osc.result,
-            }
-        )
-    for lyn in report.lynis_items:
-        lynis_dict = {
-            "id": lyn.id,
-            "lynistype_id": lyn.lynistype_id,
-            "lynis_json_id": lyn.lynis_json_id,
-            "service": lyn.service,
-            "severity": lyn.severity,
-            "long_description": lyn.long_description,
-            "desc": lyn.desc,
-            "value": lyn.value,
-            "prefval": lyn.prefval,
-            "field": lyn.field,
-        }
-        if lyn.lynistype:
-            lynis_dict["type_name"] = lyn.lynistype.name
-        report_data["lynis_items"].append(lynis_dict)
-    return report_data
+
+
+def _insert_items(
+    session: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    columns: Tuple,
+    **extra: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Bulk-inserts the rows into the model's table and returns them as report item dicts
+    (keyed like the given item columns), filled in with the generated primary keys.
+    """
+    if not rows:
+        return []
+    ids = session.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    ).scalars()
+    keys = [column.key for column in columns]
+    return [
+        {**{key: row.get(key) for key in keys}, "id": row_id, **extra}
+        for row_id, row in zip(ids, rows)
+    ]
 
 
 def put_report(
@@ -327,25 +383,12 @@ def put_report(
 ) -> Dict[str, Any]:
     """
     Creates a new report, inserts OpenSCAP rules and Lynis items, and returns the report data.
-    """
-    logger.info("Creating a new Report.")
-    new_report = Report()
-    session.add(new_report)
-    session.commit()
-    logger.debug(f"New report created with ID={new_report.id}")
-
-    logger.info(f"Inserting {len(openscap_rules)} OpenSCAP rules.")
-    for rule in openscap_rules:
-        osc = OpenSCAP(
-            report_id=new_report.id,
-            title=rule.title,
-            severity=rule.severity,
-            description=rule.description,
-            rationale=rule.rationale,
-            result=rule.result,
-        )
-        session.add(osc)
 
+    All rows are written with multi-row INSERT statements inside a single transaction,
+    so a failure leaves no partially stored report behind. The returned data is built
+    from the inserted values and the primary keys returned by the INSERTs, in the same
+    shape as get_report(), without reading the report back.
+    """
     details_type = session.query(LynisTypes).filter_by(name="details").one_or_none()
     if not details_type:
         raise ValueError("LynisTypes entry 'details' not found in database.")
@@ -355,81 +398,101 @@ def put_report(
     if not suggestions_type:
         raise ValueError("LynisTypes entry 'suggestions' not found in database.")
 
+    logger.info("Creating a new Report.")
+    new_report = Report()
+    session.add(new_report)
+    session.flush()
+    logger.debug(f"New report created with ID={new_report.id}")
+
+    logger.info(f"Inserting {len(openscap_rules)} OpenSCAP rules.")
+    osc_rows = [
+        {
+            "report_id": new_report.id,
+            "title": rule.title,
+            "severity": rule.severity,
+            "description": rule.description,
+            "rationale": rule.rationale,
+            "result": rule.result,
+        }
+        for rule in openscap_rules
+    ]
+    openscap_data = _insert_items(session, OpenSCAP, osc_rows, _OPENSCAP_ITEM_COLUMNS)
+
     logger.info(f"Inserting {len(detail_items)} Lynis detail items.")
+    detail_rows = []
     for detail in detail_items:
-        desc_obj = detail.description.dict() if detail.description else {}
-        lynis_detail = Lynis(
-            report_id=new_report.id,
-            lynistype_id=details_type.id,
-            lynis_json_id=detail.id,
-            service=detail.service,
-            desc=desc_obj.get("desc"),
-            value=desc_obj.get("value"),
-            prefval=desc_obj.get("prefval"),
-            field=desc_obj.get("field"),
+        description = detail.description
+        detail_rows.append(
+            {
+                "report_id": new_report.id,
+                "lynistype_id": details_type.id,
+                "lynis_json_id": detail.id,
+                "service": detail.service,
+                "desc": description.desc if description else None,
+                "value": description.value if description else None,
+                "prefval": description.prefval if description else None,
+                "field": description.field if description else None,
+            }
         )
-        session.add(lynis_detail)
+    lynis_data = _insert_items(
+        session, Lynis, detail_rows, _LYNIS_ITEM_COLUMNS, type_name=details_type.name
+    )
 
     logger.info(f"Inserting {len(suggestion_items)} Lynis suggestion items.")
-    for suggestion in suggestion_items:
-        lynis_suggestion = Lynis(
-            report_id=new_report.id,
-            lynistype_id=suggestions_type.id,
-            lynis_json_id=suggestion.id,
-            severity=suggestion.severity,
-            long_description=suggestion.description,
-        )
-        session.add(lynis_suggestion)
-
-    session.commit()
-    logger.debug("All items inserted and committed successfully.")
-
-    logger.info("Fetching the newly created report with relations.")
-    created_report = (
-        session.query(Report)
-        .options(selectinload(Report.openscap_items), selectinload(Report.lynis_items))
-        .filter(Report.id == new_report.id)
-        .one()
+    suggestion_rows = [
+        {
+            "report_id": new_report.id,
+            "lynistype_id": suggestions_type.id,
+            "lynis_json_id": suggestion.id,
+            "severity": suggestion.severity,
+            "long_description": suggestion.description,
+        }
+        for suggestion in suggestion_items
+    ]
+    lynis_data += _insert_items(
+        session,
+        Lynis,
+        suggestion_rows,
+        _LYNIS_ITEM_COLUMNS,
+        type_name=suggestions_type.name,
     )
 
     report_data = {
-        "report_id": created_report.id,
-        "date": str(created_report.date),
-        "openscap_items": [],
-        "lynis_items": [],
+        "report_id": new_report.id,
+        "date": str(new_report.date),
+        "openscap_items": openscap_data,
+        "lynis_items": lynis_data,
     }
-    for osc in created_report.openscap_items:
-        report_data["openscap_items"].append(
-            {
-                "id": osc.id,
-                "title": osc.title,
-                "severity": osc.severity,
-                "description": osc.description,
-                "rationale": osc.rationale,
-                "result": osc.result,
-            }
-        )
-    for lyn in created_report.lynis_items:
-        lynis_dict = {
-            "id": lyn.id,
-            "lynistype_id": lyn.lynistype_id,
-            "lynis_json_id": lyn.lynis_json_id,
-            "service": lyn.service,
-            "severity": lyn.severity,
-            "long_description": lyn.long_description,
-            "desc": lyn.desc,
-            "value": lyn.value,
-            "prefval": lyn.prefval,
-            "field": lyn.field,
-        }
-        if lyn.lynistype:
-            lynis_dict["type_name"] = lyn.lynistype.name
-        report_data["lynis_items"].append(lynis_dict)
+    session.commit()
+    logger.debug("All items inserted and committed successfully.")
 
-    logger.info(f"put_report completed for Report ID={created_report.id}")
+    logger.info(f"put_report completed for Report ID={report_data['report_id']}")
     return report_data
 
 
+def _generated_report_row(
+    report_id: int,
+    object_a_type: str,
+    object_a_id: Optional[int],
+    object_b_type: Optional[str] = None,
+    object_b_id: Optional[int] = None,
+    similarity_score: Optional[float] = None,
+    verified: bool = False,
+) -> Dict[str, Any]:
+    """
+    Builds the column values of a single GeneratedReport row for a bulk INSERT.
+    """
+    return {
+        "report_id": report_id,
+        "object_a_type": object_a_type,
+        "object_a_id": object_a_id,
+        "object_b_type": object_b_type,
+        "object_b_id": object_b_id,
+        "similarity_score": similarity_score,
+        "verified": verified,
+    }
+
+
 def store_generated_report(
     session: Session, report_id: int, pipeline_results: Dict[str, Any]
 ) -> None:
@@ -444,6 +507,8 @@ def store_generated_report(
 
     For each verified pair, both object A and object B database IDs are stored.
     For unverified pairs and unpaired objects, only object A's ID is stored.
+    Database IDs are resolved from two lookups prefetched for the report, and all rows
+    are written with a single bulk INSERT.
     """
     pairs = pipeline_results.get("pairs", [])
     unpaired_osc = pipeline_results.get("unpaired_openscap", [])
@@ -455,85 +520,49 @@ def store_generated_report(
         f"Found {len(pairs)} pairs, {len(unpaired_osc)} unpaired OpenSCAP, {len(unpaired_det)} unpaired Detail, and {len(unpaired_sugg)} unpaired Suggestion items."
     )
 
+    osc_ids = get_db_ids_for_openscap(session, report_id)
+    lynis_ids = get_db_ids_for_lynis(session, report_id)
+
+    rows = []
     for obj_a, obj_b, sim_score, verified in pairs:
+        db_id_a = osc_ids.get(obj_a.title)
         if verified:
-
-            object_a_type = "openscap"
             object_b_type = (
                 "suggestion"
                 if hasattr(obj_b, "severity") and obj_b.severity is not None
                 else "detail"
             )
-            db_id_a = get_db_id_for_openscap(session, obj_a)
-            db_id_b = get_db_id_for_lynis(session, obj_b)
+            db_id_b = lynis_ids.get(getattr(obj_b, "id", None))
             logger.debug(
-                f"Storing verified pair: {db_id_a} ({object_a_type}) and {db_id_b} ({object_b_type}) with sim={sim_score:.3f}"
+                f"Storing verified pair: {db_id_a} (openscap) and {db_id_b} ({object_b_type}) with sim={sim_score:.3f}"
             )
-            new_generated = GeneratedReport(
-                report_id=report_id,
-                object_a_type=object_a_type,
-                object_a_id=db_id_a,
-                object_b_type=object_b_type,
-                object_b_id=db_id_b,
-                similarity_score=sim_score,
-                verified=True,
+            rows.append(
+                _generated_report_row(
+                    report_id,
+                    "openscap",
+                    db_id_a,
+                    object_b_type=object_b_type,
+                    object_b_id=db_id_b,
+                    similarity_score=sim_score,
+                    verified=True,
+                )
             )
-            session.add(new_generated)
         else:
-            object_a_type = "openscap"
-            db_id_a = get_db_id_for_openscap(session, obj_a)
-            logger.debug(
-                f"Storing non-verified pair as unpaired: {db_id_a} ({object_a_type})"
-            )
-            new_generated = GeneratedReport(
-                report_id=report_id,
-                object_a_type=object_a_type,
-                object_a_id=db_id_a,
-                object_b_type=None,
-                object_b_id=None,
-                similarity_score=None,
-                verified=False,
-            )
-            session.add(new_generated)
+            logger.debug(f"Storing non-verified pair as unpaired: {db_id_a} (openscap)")
+            rows.append(_generated_report_row(report_id, "openscap", db_id_a))
     for obj in unpaired_osc:
-        db_id = get_db_id_for_openscap(session, obj)
-        logger.debug(f"Storing unpaired OpenSCAP: {db_id}")
-        new_generated = GeneratedReport(
-            report_id=report_id,
-            object_a_type="openscap",
-            object_a_id=db_id,
-            object_b_type=None,
-            object_b_id=None,
-            similarity_score=None,
-            verified=False,
-        )
-        session.add(new_generated)
-    for obj in unpaired_det:
-        db_id = get_db_id_for_lynis(session, obj)
-        logger.debug(f"Storing unpaired Detail: {db_id}")
-        new_generated = GeneratedReport(
-            report_id=report_id,
-            object_a_type="detail",
-            object_a_id=db_id,
-            object_b_type=None,
-            object_b_id=None,
-            similarity_score=None,
-            verified=False,
+        rows.append(
+            _generated_report_row(report_id, "openscap", osc_ids.get(obj.title))
         )
-        session.add(new_generated)
-    for obj in unpaired_sugg:
-        db_id = get_db_id_for_lynis(session, obj)
-        logger.debug(f"Storing unpaired Suggestion: {db_id}")
-        new_generated = GeneratedReport(
-            report_id=report_id,
-            object_a_type="suggestion",
-            object_a_id=db_id,
-            object_b_type=None,
-            object_b_id=None,
-            similarity_score=None,
-            verified=False,
-        )
-        session.add(new_generated)
-
+    for object_a_type, objects in (
+        ("detail", unpaired_det),
+        ("suggestion", unpaired_sugg),
+    ):
+        for obj in objects:
+            db_id = lynis_ids.get(getattr(obj, "id", None))
+            rows.append(_generated_report_row(report_id, object_a_type, db_id))
+
+    if rows:
+        session.execute(insert(GeneratedReport), rows)
     session.commit()
     logger.info("All GeneratedReport records stored.")
@@ -1,11 +1,199 @@
+import hashlib
+import json
+import os
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import numpy as np
-import torch
-from transformers import AutoTokenizer, AutoModel
 from loguru import logger
+from consts import (
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CPU_BF16,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_MEMORY_CACHE_MAX_ENTRIES,
+    EMBEDDING_NUM_WORKERS,
+    EMBEDDING_TORCH_COMPILE,
+)
+
+# torch and transformers take seconds to import, so they are only imported once an
+# embedding is actually needed.
+if TYPE_CHECKING:
+    import torch
 
 MODEL_NAME = "jackaduma/SecBERT"
+PAD_TO_MULTIPLE_OF = 32
 _tokenizer = None
 _model = None
+# torch.compile wrapper of _model, only set on CUDA with EMBEDDING_TORCH_COMPILE.
+_compiled_model = None
+_embedding_cache = None
+# Embeddings computed or loaded during this process, keyed by the exact text.
+_memory_cache: Dict[str, np.ndarray] = {}
+
+
+class EmbeddingCache:
+    """
+    Persistent store of text embeddings keyed by the SHA1 of the text.
+
+    The vectors are kept in a single .npy file that is memory-mapped on load. An index
+    file names that vectors file and lists the keys in insertion order, together with the
+    model and inference dtype that produced them; a cache written under another model or
+    dtype is ignored. Once more than `max_entries` vectors are stored, the oldest ones
+    are evicted first.
+
+    save() writes the vectors to a new, uniquely named file and then replaces the index,
+    so the index always refers to a complete vectors file written with it, even if a
+    save is interrupted or several processes save at the same time.
+    """
+
+    def __init__(
+        self,
+        path: Path = EMBEDDING_CACHE_DIR,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        dtype: str = "float32",
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self._index_file = self.path / "index.json"
+        self._vectors_name: Optional[str] = None
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._pending: Dict[str, np.ndarray] = {}
+        self._load()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        if not self._index_file.exists():
+            return
+        try:
+            index = json.loads(self._index_file.read_text())
+            vectors_name = index.get("vectors")
+            if (
+                index.get("model") != MODEL_NAME
+                or index.get("dtype") != self.dtype
+                or not vectors_name
+            ):
+                logger.warning(f"Ignoring stale embedding cache at {self.path}.")
+                return
+            vectors = np.load(self.path / vectors_name, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable embedding cache at {self.path}: {e}")
+            return
+        if len(index.get("keys", [])) != len(vectors):
+            logger.warning(f"Ignoring corrupt embedding cache at {self.path}.")
+            return
+        self._vectors_name = vectors_name
+        self._keys = index["keys"]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._vectors = vectors
+        logger.debug(f"Loaded {len(self._keys)} cached embeddings from {self.path}")
+
+    @property
+    def dim(self) -> Optional[int]:
+        """
+        Width of the stored vectors, or None while the cache is empty.
+        """
+        if self._vectors is not None:
+            return self._vectors.shape[1]
+        if self._pending:
+            return len(next(iter(self._pending.values())))
+        return None
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Returns the cached embedding for the text, or None if it has not been stored.
+        """
+        key = self.key(text)
+        if key in self._pending:
+            return self._pending[key]
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._vectors[row])
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """
+        Adds an embedding to the cache. It is written to disk on the next save().
+        """
+        key = self.key(text)
+        if key not in self._rows:
+            self._pending[key] = np.asarray(vector, dtype=np.float32)
+
+    def save(self) -> None:
+        """
+        Writes pending embeddings to disk, evicting the oldest entries above max_entries.
+        """
+        if not self._pending:
+            return
+        keys = self._keys + list(self._pending)
+        blocks = [np.stack(list(self._pending.values()))]
+        if self._vectors is not None:
+            blocks.insert(0, np.asarray(self._vectors))
+        vectors = np.concatenate(blocks)
+        if len(keys) > self.max_entries:
+            evicted = len(keys) - self.max_entries
+            keys = keys[evicted:]
+            vectors = vectors[evicted:]
+            logger.debug(f"Evicted {evicted} embeddings from the cache.")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        token = uuid.uuid4().hex
+        vectors_name = f"vectors-{token}.npy"
+        tmp_index = self.path / f"index-{token}.tmp"
+        np.save(self.path / vectors_name, vectors)
+        tmp_index.write_text(
+            json.dumps(
+                {
+                    "model": MODEL_NAME,
+                    "dtype": self.dtype,
+                    "vectors": vectors_name,
+                    "keys": keys,
+                }
+            )
+        )
+        # Replacing the index is the single step that commits the new vectors file.
+        os.replace(tmp_index, self._index_file)
+
+        previous = self._vectors_name
+        self._vectors_name = vectors_name
+        self._keys = keys
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._vectors = np.load(self.path / vectors_name, mmap_mode="r")
+        self._pending.clear()
+        if previous is not None:
+            # Another process may have removed it already, or still have it mapped.
+            try:
+                (self.path / previous).unlink()
+            except OSError:
+                pass
+        logger.debug(f"Saved {len(keys)} embeddings to {self.path}")
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Loads the persistent embedding cache using a singleton pattern. The cache is bound
+    to the dtype inference runs in, so embeddings computed in another precision are not
+    reused.
+    """
+    global _embedding_cache
+    if _embedding_cache is None:
+        dtype = str(_inference_settings()[1]).removeprefix("torch.")
+        _embedding_cache = EmbeddingCache(dtype=dtype)
+    return _embedding_cache
+
+
+def save_embedding_cache() -> None:
+    """
+    Writes the embeddings computed since the last save to the persistent cache.
+    """
+    if _embedding_cache is not None:
+        _embedding_cache.save()
 
 
 def get_tokenizer():
@@ -14,22 +202,259 @@ def get_tokenizer():
     """
     global _tokenizer
     if _tokenizer is None:
+        from transformers import AutoTokenizer
+
         logger.info(f"Loading tokenizer: {MODEL_NAME}")
         _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
     return _tokenizer
 
 
+def _cpu_has_native_bf16() -> bool:
+    """
+    True if the CPU executes bfloat16 matmuls natively (AVX512-BF16 or AMX); elsewhere
+    oneDNN emulates them and they are slower than float32.
+    """
+    import torch
+
+    checks = ("_is_avx512_bf16_supported", "_is_amx_tile_supported")
+    return any(getattr(torch.cpu, name, lambda: False)() for name in checks)
+
+
+@lru_cache(maxsize=None)
+def _inference_settings() -> Tuple[str, "torch.dtype"]:
+    """
+    Returns the device and dtype used for inference: float16 on the GPU, float32 on the
+    CPU. bfloat16 is used on the CPU only when EMBEDDING_CPU_BF16 is set and the CPU
+    supports it natively.
+    """
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda", torch.float16
+    if EMBEDDING_CPU_BF16:
+        if _cpu_has_native_bf16():
+            return "cpu", torch.bfloat16
+        logger.warning(
+            "EMBEDDING_CPU_BF16 is set but this CPU has no native bfloat16 support; "
+            "using float32."
+        )
+    return "cpu", torch.float32
+
+
 def get_model():
     """
     Loads the model for the specified model using a singleton pattern.
     """
-    global _model
+    global _model, _compiled_model
     if _model is None:
-        logger.info(f"Loading model: {MODEL_NAME}")
-        _model = AutoModel.from_pretrained(MODEL_NAME)
+        import torch
+        from transformers import AutoModel
+
+        device, dtype = _inference_settings()
+        logger.info(f"Loading model: {MODEL_NAME} ({device}, {dtype})")
+        _model = (
+            AutoModel.from_pretrained(MODEL_NAME).to(device=device, dtype=dtype).eval()
+        )
+        if device == "cuda" and EMBEDDING_TORCH_COMPILE:
+            # Compilation itself only happens on the first call; see _forward.
+            _compiled_model = torch.compile(_model, dynamic=True)
+        if device == "cpu":
+            # Intra-op threads already default to the physical core count; a single
+            # inter-op thread avoids oversubscribing them alongside tokenizer workers.
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                logger.debug("Inter-op thread count already fixed; leaving it as is.")
     return _model
 
 
+def _forward(inputs):
+    """
+    Runs the model on a tokenized batch, through the compiled model when there is one.
+    torch.compile reports unsupported ops or a missing toolchain only when the compiled
+    model is first called, so a failure there switches to eager execution for good.
+    """
+    global _compiled_model
+    if _compiled_model is not None:
+        try:
+            return _compiled_model(**inputs)
+        except Exception as e:
+            logger.warning(f"torch.compile failed, running the model eagerly: {e}")
+            _compiled_model = None
+    return get_model()(**inputs)
+
+
+@lru_cache(maxsize=None)
+def _config_hidden_size() -> int:
+    from transformers import AutoConfig
+
+    return AutoConfig.from_pretrained(MODEL_NAME).hidden_size
+
+
+def _embedding_dim() -> int:
+    """
+    Returns the embedding width without loading the model weights: it is taken from an
+    already loaded model or from cached embeddings, and otherwise read from the model
+    config alone.
+    """
+    if _model is not None:
+        return _model.config.hidden_size
+    if _memory_cache:
+        return len(next(iter(_memory_cache.values())))
+    dim = get_embedding_cache().dim
+    return dim if dim is not None else _config_hidden_size()
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scales every row of the matrix to unit length (all-zero rows are left as zeros).
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-9)).astype(np.float32, copy=False)
+
+
+def _mean_pool(
+    hidden_state: "torch.Tensor", attention_mask: "torch.Tensor"
+) -> "torch.Tensor":
+    """
+    Averages the token embeddings of each sequence, ignoring padded positions.
+    """
+    mask = attention_mask.unsqueeze(-1).float()
+    sum_embeddings = (hidden_state * mask).sum(1)
+    sum_mask = mask.sum(1).clamp(min=1e-9)
+    return sum_embeddings / sum_mask
+
+
+class _TextDataset:
+    """
+    Map-style dataset over a list of texts, consumed by the tokenizing DataLoader.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.texts[idx]
+
+
+def _tokenize_batch(batch: List[str]):
+    """
+    DataLoader collate function: tokenizes one batch of texts into padded tensors.
+    """
+    return get_tokenizer()(
+        batch,
+        return_tensors="pt",
+        truncation=True,
+        padding=True,
+        # Bucketed lengths keep the kernels on aligned shapes and limit recompiles.
+        pad_to_multiple_of=PAD_TO_MULTIPLE_OF,
+    )
+
+
+def _embed_batches(texts: List[str], batch_size: int) -> np.ndarray:
+    """
+    Runs the texts through the model, sorted by length and in padded batches of
+    `batch_size`, so sequences of similar length share a batch and little compute is
+    spent on padding. Returns the L2-normalized embeddings in input order.
+
+    With EMBEDDING_NUM_WORKERS set and more than one batch, tokenization runs in
+    DataLoader worker processes so the next batches are prepared while the model works
+    on the current one.
+    """
+    import torch
+    from torch.utils.data import DataLoader
+
+    get_tokenizer()
+    model = get_model()
+    device, dtype = _inference_settings()
+    embeddings = np.empty((len(texts), model.config.hidden_size), dtype=np.float32)
+    order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+
+    num_workers = EMBEDDING_NUM_WORKERS if len(texts) > batch_size else 0
+    if num_workers:
+        # The workers are forked after the tokenizer has been used; keeping the Rust
+        # tokenizer single-threaded stops the fork from tripping its deadlock guard.
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    loader = DataLoader(
+        _TextDataset([texts[idx] for idx in order]),
+        batch_size=batch_size,
+        shuffle=False,
+        num_workers=num_workers,
+        collate_fn=_tokenize_batch,
+    )
+
+    # Autocast only applies to reduced precision; plain float32 runs without it.
+    use_autocast = dtype != torch.float32
+    for start, inputs in zip(range(0, len(order), batch_size), loader):
+        batch_idx = order[start : start + batch_size]
+        inputs = inputs.to(device)
+        with torch.inference_mode(), torch.autocast(
+            device_type=device, dtype=dtype, enabled=use_autocast
+        ):
+            outputs = _forward(inputs)
+        # Pooling runs in float32; only the transformer itself uses reduced precision.
+        pooled = _mean_pool(outputs.last_hidden_state.float(), inputs["attention_mask"])
+        embeddings[batch_idx] = pooled.cpu().numpy()
+
+    return l2_normalize(embeddings)
+
+
+def get_embeddings(
+    texts: List[str], batch_size: int = 32, persist: bool = True
+) -> np.ndarray:
+    """
+    Returns the embeddings for all provided texts as a single (len(texts), hidden_size) matrix.
+
+    Duplicate texts are embedded once, and embeddings already held in memory or in the
+    persistent cache are reused; only the remaining texts are fed through the model, and
+    their results are added to both caches. Rows of
+    the result follow the order of the input list and are scaled to unit length, so the
+    dot product of two rows is their cosine similarity.
+
+    Args:
+        texts (List[str]): The input texts for which to generate embeddings.
+        batch_size (int): Maximum number of texts per forward pass.
+        persist (bool): Write newly computed embeddings to the persistent cache right
+            away; callers embedding several lists can pass False and call
+            save_embedding_cache() once at the end instead.
+
+    Returns:
+        np.ndarray: The resulting L2-normalized float32 embeddings, one row per input text.
+    """
+    texts = [text or "" for text in texts]
+    if not texts:
+        return np.empty((0, _embedding_dim()), dtype=np.float32)
+
+    # Each distinct text is embedded once, however often it appears in the input.
+    unique: Dict[str, Optional[np.ndarray]] = dict.fromkeys(texts)
+    cache = get_embedding_cache()
+    for text in unique:
+        vector = _memory_cache.get(text)
+        unique[text] = vector if vector is not None else cache.get(text)
+    misses = [text for text, vector in unique.items() if vector is None]
+    logger.debug(
+        f"Embedding {len(texts)} texts ({len(unique)} unique): "
+        f"{len(unique) - len(misses)} cached, {len(misses)} to compute."
+    )
+
+    if misses:
+        computed = _embed_batches(misses, batch_size)
+        for text, vector in zip(misses, computed):
+            unique[text] = vector
+            cache.put(text, vector)
+        if persist:
+            cache.save()
+
+    _memory_cache.update(unique)
+    while len(_memory_cache) > EMBEDDING_MEMORY_CACHE_MAX_ENTRIES:
+        del _memory_cache[next(iter(_memory_cache))]
+
+    return np.stack([unique[text] for text in texts])
+
+
 def get_embedding(text: str) -> np.ndarray:
     """
     Returns the embedding (as a NumPy array) for the provided text using the "jackaduma/SecBERT" model.
@@ -38,28 +463,15 @@ def get_embedding(text: str) -> np.ndarray:
       - Tokenizes the input text.
       - Feeds it through the model to obtain the last hidden state.
       - Applies mean pooling (taking into account the attention mask) to generate a fixed-size sentence embedding.
+      - Scales the embedding to unit length.
 
     Args:
         text (str): The input text for which to generate an embedding.
 
     Returns:
-        np.ndarray: The resulting sentence embedding.
+        np.ndarray: The resulting L2-normalized sentence embedding.
     """
-    tokenizer = get_tokenizer()
-    model = get_model()
-    if not text:
-        text = ""
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-    embeddings = outputs.last_hidden_state
-    attention_mask = inputs["attention_mask"]
-    input_mask_expanded = attention_mask.unsqueeze(-1).expand(embeddings.size()).float()
-    sum_embeddings = torch.sum(embeddings * input_mask_expanded, 1)
-    sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-    mean_embeddings = sum_embeddings / sum_mask
-
-    return mean_embeddings[0].cpu().numpy()
+    return get_embeddings([text])[0]
 
 
 def cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
@@ -73,11 +485,7 @@ def cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
     Returns:
         float: Cosine similarity score.
     """
-    vec_a = vec_a.astype(np.float32)
-    vec_b = vec_b.astype(np.float32)
-    dot_val = np.dot(vec_a, vec_b)
-    norm_a = np.linalg.norm(vec_a)
-    norm_b = np.linalg.norm(vec_b)
-    if norm_a == 0 or norm_b == 0:
+    denominator = np.sqrt(np.vdot(vec_a, vec_a) * np.vdot(vec_b, vec_b))
+    if denominator == 0:
         return 0.0
-    return float(dot_val / (norm_a * norm_b))
+    return float(np.vdot(vec_a, vec_b) / denominator)
@@ -1,4 +1,4 @@
-import json
+import orjson
 from loguru import logger
 
 from consts import LYNIS_REPORT
@@ -11,8 +11,8 @@ def parse_lynis_report_pydantic():
     Returns a list of DetailItemLynis objects and a list of SuggestionItemLynis objects.
     """
     logger.info(f"Loading JSON from {LYNIS_REPORT}.")
-    with open(LYNIS_REPORT, "r") as f:
-        data = json.load(f)
+    with open(LYNIS_REPORT, "rb") as f:
+        data = orjson.loads(f.read())
 
     details_list = data.get("details[]", [])
     suggestions_list = data.get("suggestion[]", [])
@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session
 from loguru import logger
-from consts import DATABASE_URL
-from database import init_database, put_report, store_generated_report, get_report
+from database import (
+    SessionLocal,
+    init_database,
+    put_report,
+    store_generated_report,
+)
 from lynis_json import parse_lynis_report_pydantic
 from openscap_json import load_openscap_rules
 from pdf_generator import generate_audit_report_pdf
@@ -23,9 +26,7 @@ def run_full_pipeline(pdf_path: str) -> None:
         pdf_path: File path where the PDF report will be saved.
     """
     logger.info("Starting program.")
-    init_database(echo=True)
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    init_database()
     session: Session = SessionLocal()
 
     try:
@@ -52,7 +53,7 @@ def run_full_pipeline(pdf_path: str) -> None:
         logger.info("Generated comparison results stored successfully.")
 
         logger.info("Generating PDF Audit Report.")
-        generate_audit_report_pdf(session, new_report_id, str(pdf_path))
+        generate_audit_report_pdf(session, new_report_id, pdf_path)
         logger.info(f"PDF Audit Report generated at: {pdf_path}")
 
     except Exception as e:
@@ -1,34 +1,39 @@
-import json
+import ijson
 from typing import List
 from loguru import logger
+from pydantic import TypeAdapter
 from models import OpenSCAPRule
 from consts import OPENSCAP_REPORT
 
+# Validates a whole list of rule dicts in a single pydantic-core call.
+_RULES_ADAPTER = TypeAdapter(List[OpenSCAPRule])
+# Rules held as raw dicts at a time while streaming the report.
+_RULES_BATCH_SIZE = 500
+
 
 def load_openscap_rules() -> List[OpenSCAPRule]:
     """
     Converts the 'rules' JSON dictionary into a list of validated OpenSCAPRule objects,
     using Pydantic for data validation and Loguru for logging.
 
-    Args:
-        rules_json (dict): Dictionary read from the "rules" key in the OpenSCAP JSON report.
+    The report is streamed with ijson, so only one batch of raw rule dicts is in memory
+    at a time instead of the whole decoded report.
 
     Returns:
         List[OpenSCAPRule]: A list of OpenSCAPRule objects with validated fields.
     """
 
-    with open(OPENSCAP_REPORT, "r") as file:
-        openscap_report = json.load(file)
-    rules = openscap_report.get("rules", {})
-    rules_list = list(rules.values())
-
-    logger.info(f"Found {len(rules_list)} rules in JSON. Parsing now.")
-
-    parsed_rules = []
-    for idx, rule_dict in enumerate(rules_list, start=1):
-        rule_obj = OpenSCAPRule(**rule_dict)
-        parsed_rules.append(rule_obj)
-        logger.debug(f"[{idx}] Parsed rule: {rule_obj.title}")
+    logger.info(f"Streaming rules from {OPENSCAP_REPORT}.")
+
+    parsed_rules: List[OpenSCAPRule] = []
+    batch = []
+    with open(OPENSCAP_REPORT, "rb") as file:
+        for _rule_id, rule_dict in ijson.kvitems(file, "rules"):
+            batch.append(rule_dict)
+            if len(batch) >= _RULES_BATCH_SIZE:
+                parsed_rules.extend(_RULES_ADAPTER.validate_python(batch))
+                batch = []
+    parsed_rules.extend(_RULES_ADAPTER.validate_python(batch))
 
     logger.info(f"Successfully parsed {len(parsed_rules)} rules.")
     return parsed_rules
@@ -1,28 +1,315 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import (
-    SimpleDocTemplate,
+    BaseDocTemplate,
+    Flowable,
+    Frame,
+    PageTemplate,
     Paragraph,
+    Preformatted,
     Spacer,
     PageBreak,
     Table,
     TableStyle,
 )
 from reportlab.lib import colors
-from sqlalchemy.orm import Session
-from database import get_report, GeneratedReport, OpenSCAP, Lynis
+from reportlab.lib.utils import simpleSplit
+from sqlalchemy import and_, create_engine, func, or_, select
+from sqlalchemy.orm import Session, sessionmaker
+from database import (
+    engine,
+    GeneratedReport,
+    Report,
+    OpenSCAP,
+    Lynis,
+    SessionLocal,
+)
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from jinja2 import Environment
+import os
 import re
 
+_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+# Joins texts for batch sanitizing; neither part of a <br> tag nor matched by \s.
+_SANITIZE_SEPARATOR = "\0"
+# Records laid out per batch; only the flowables of the current batch are kept alive.
+_RECORDS_PER_BATCH = 200
+# Lowercased GeneratedReport.object_a_type values that reference a Lynis row.
+_LYNIS_RECORD_TYPES = ("detail", "suggestion")
+
+# Styles and fixed flowables are built once and shared by every generated report.
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    "TitleStyle",
+    parent=_STYLES["Title"],
+    fontSize=18,
+    alignment=1,
+    textColor=colors.darkblue,
+    spaceAfter=16,
+)
+_SUBTITLE_STYLE = ParagraphStyle(
+    "SubtitleStyle",
+    parent=_STYLES["Heading2"],
+    fontSize=14,
+    alignment=1,
+    textColor=colors.black,
+    spaceAfter=12,
+)
+_NORMAL_STYLE = _STYLES["Normal"]
+_METADATA_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("PADDING", (0, 0), (-1, -1), 6),
+    ]
+)
+# Words up to this many characters always fit the frame width in the normal style.
+_PLAIN_TEXT_MAX_WORD_LENGTH = 40
+# Separator Line
+_HR_PARAGRAPH = Paragraph("<hr width='100%' color='black'/>", _NORMAL_STYLE)
+
+# Page layout and styles mirror the ReportLab document above.
+_HTML_TEMPLATE = Environment(autoescape=True).from_string("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Audit Report</title>
+<style>
+  @page { size: A4; margin: 72pt; }
+  body { font-family: Helvetica, Arial, sans-serif; font-size: 10pt; line-height: 12pt; }
+  h1 { font-size: 18pt; line-height: 22pt; text-align: center; color: darkblue;
+       margin: 0 0 26pt; }
+  h2 { font-size: 14pt; line-height: 17pt; text-align: center; margin: 0 0 12pt; }
+  p { margin: 0 0 12pt; }
+  h2, p { white-space: pre-line; }
+  table { border-collapse: collapse; margin: 0 auto 20pt; font-weight: bold; }
+  td { border: 0.5pt solid grey; padding: 6pt; }
+  tr:first-child { background: lightgrey; }
+  td:first-child { width: 120pt; }
+  td:last-child { width: 300pt; }
+  hr { border: 0; border-top: 1pt solid black; margin: 0 0 10pt;
+       break-after: page; }
+</style>
+</head>
+<body>
+<h1>Audit Report</h1>
+<table>
+  <tr><td>Report Date:</td><td>{{ date }}</td></tr>
+  <tr><td>Total Findings:</td><td>{{ record_count }}</td></tr>
+</table>
+<hr>
+{% for title, description in sections %}
+<h2>{{ title }}</h2>
+<p>{{ description }}</p>
+{% endfor %}
+</body>
+</html>
+""")
+
+
+class StreamingDocTemplate(BaseDocTemplate):
+    """
+    Single-frame document (same page layout as SimpleDocTemplate) that lays out
+    flowables batch by batch instead of from one list holding the whole report.
+    BaseDocTemplate.build() deletes the first element of that list per flowable, which is
+    quadratic in the report size; per batch the cost stays bounded.
+
+    start() and finish() reproduce what build() does around its layout loop, using the
+    private _startBuild/_endBuild hooks and the canvas attributes build() sets. They were
+    written against reportlab 4.2.5, the exact version pinned in requirements.txt; check
+    build() again before bumping that pin.
+    """
+
+    def __init__(self, filename, **kw):
+        super().__init__(filename, **kw)
+        frame = Frame(
+            self.leftMargin, self.bottomMargin, self.width, self.height, id="normal"
+        )
+        self.addPageTemplates(
+            [PageTemplate(id="Page", frames=[frame], pagesize=self.pagesize)]
+        )
+
+    def start(self) -> None:
+        """Opens the canvas; must be called before add_flowables()."""
+        self._startBuild()
+        self.canv._doctemplate = self
+        self._saved_info = self.canv._doc.info
+
+    def add_flowables(self, flowables: List[Flowable]) -> None:
+        """Lays out the given flowables, emptying the list."""
+        while flowables:
+            self.clean_hanging()
+            self.handle_flowable(flowables)
+
+    def finish(self) -> None:
+        """Finishes the last page and writes the file."""
+        del self.canv._doctemplate
+        self.canv._doc.info = self._saved_info
+        self._endBuild()
+
+
+class PlainParagraph(Preformatted):
+    """
+    Markup-free text laid out like a Paragraph (whitespace collapsed, lines wrapped to the
+    available width) without running it through Paragraph's markup parser.
+    """
+
+    def __init__(self, text: str, style: ParagraphStyle):
+        super().__init__("", style)
+        self.text = " ".join(text.split())
+
+    def _reflow(self, availWidth) -> None:
+        self.lines = (
+            simpleSplit(self.text, self.style.fontName, self.style.fontSize, availWidth)
+            if self.text
+            else []
+        )
+
+    def wrap(self, availWidth, availHeight):
+        self._reflow(availWidth)
+        return super().wrap(availWidth, availHeight)
+
+    def split(self, availWidth, availHeight):
+        self._reflow(availWidth)
+        return super().split(availWidth, availHeight)
+
+
+def description_flowable(text: str) -> Flowable:
+    """
+    Uses PlainParagraph for text without markup or entities, Paragraph otherwise. Text with
+    very long words also stays a Paragraph, which can split a word wider than the frame.
+    """
+    if (
+        "<" in text
+        or "&" in text
+        or any(len(word) > _PLAIN_TEXT_MAX_WORD_LENGTH for word in text.split())
+    ):
+        return Paragraph(text, _NORMAL_STYLE)
+    return PlainParagraph(text, _NORMAL_STYLE)
+
 
 def sanitize_text(text: str) -> str:
     """Replaces <br> tags (and similar variants) with newline characters."""
-    if text:
-        text = re.sub(r"<br\s*/?>", "\n", text, flags=re.IGNORECASE)
-    return text
+    # Most texts contain no tags at all; a substring check is far cheaper than the regex.
+    return _BR_RE.sub("\n", text) if text and "<" in text else text
+
+
+def sanitize_texts(texts: List[str]) -> List[str]:
+    """Applies sanitize_text to every text with a single substitution over all of them."""
+    joined = _SANITIZE_SEPARATOR.join(texts)
+    if "<" not in joined:
+        return texts
+    if joined.count(_SANITIZE_SEPARATOR) != len(texts) - 1:
+        # Some text contains the separator itself.
+        return [sanitize_text(text) for text in texts]
+    return _BR_RE.sub("\n", joined).split(_SANITIZE_SEPARATOR)
+
+
+def _section_flowables(sections: List[str]) -> List[Flowable]:
+    """Builds the PDF sections from alternating title and description texts."""
+    sections = sanitize_texts(sections)
+    flowables = []
+    for title, description in zip(sections[::2], sections[1::2]):
+        flowables.append(Paragraph(title, _SUBTITLE_STYLE))
+        flowables.append(description_flowable(description))
+        flowables.append(Spacer(1, 12))
+    return flowables
+
+
+def _iter_report_sections(
+    session: Session, report_id: int
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yields the (title, description) texts of every section of the report, unsanitized,
+    in record order. Only the first record of each Lynis JSON id gets a section.
+    """
+    # Each record is joined to the OpenSCAP or Lynis row it references (the other side
+    # stays NULL), so the whole report is read with one streamed query. Only the
+    # columns printed in the report are selected.
+    object_a_type = func.lower(GeneratedReport.object_a_type)
+    lynis_join = and_(
+        object_a_type.in_(_LYNIS_RECORD_TYPES),
+        GeneratedReport.object_a_id == Lynis.id,
+    )
+    # Only the first record per Lynis JSON id is printed; NULL and empty ids never
+    # count as duplicates.
+    first_lynis_records = (
+        select(func.min(GeneratedReport.id))
+        .join(Lynis, lynis_join)
+        .where(GeneratedReport.report_id == report_id, Lynis.lynis_json_id != "")
+        .group_by(Lynis.lynis_json_id)
+    )
+    gen_rows = session.execute(
+        select(
+            GeneratedReport.object_a_type,
+            OpenSCAP.id.label("openscap_id"),
+            OpenSCAP.title,
+            OpenSCAP.description,
+            Lynis.id.label("lynis_id"),
+            Lynis.lynis_json_id,
+            Lynis.service,
+            Lynis.field,
+            Lynis.long_description,
+            Lynis.desc,
+        )
+        .select_from(GeneratedReport)
+        .outerjoin(
+            OpenSCAP,
+            and_(
+                object_a_type == "openscap",
+                GeneratedReport.object_a_id == OpenSCAP.id,
+            ),
+        )
+        .outerjoin(Lynis, lynis_join)
+        .where(
+            GeneratedReport.report_id == report_id,
+            or_(
+                func.coalesce(Lynis.lynis_json_id, "") == "",
+                GeneratedReport.id.in_(first_lynis_records),
+            ),
+        )
+        .order_by(GeneratedReport.id)
+        .execution_options(yield_per=_RECORDS_PER_BATCH)
+    )
+    for row in gen_rows:
+        title = ""
+        description = ""
+        record_type = row.object_a_type.lower()
+
+        if record_type == "openscap":
+            if row.openscap_id is not None:
+                title = row.title
+                description = row.description or ""
+
+        elif record_type in _LYNIS_RECORD_TYPES:
+            if row.lynis_id is not None:
+                lynis_id = row.lynis_json_id
+
+                title = row.service if row.service else "Lynis Record"
+                if row.field:
+                    title += f" ({row.field})"
+
+                if record_type == "suggestion" and lynis_id:
+                    title = f"Suggestion {lynis_id}: {title}"
+
+                description = (
+                    row.long_description if row.long_description else (row.desc or "")
+                )
+
+        else:
+            title = f"Unknown Type ({row.object_a_type})"
+            description = ""
+
+        yield title, description
 
 
-def generate_audit_report_pdf(session: Session, report_id: int, pdf_path) -> None:
+def generate_audit_report_pdf(session: Session, report_id: int, pdf_path) -> bool:
     """
     Generates an Audit Report PDF for the given report_id.
 
@@ -38,130 +325,184 @@ def generate_audit_report_pdf(session: Session, report_id: int, pdf_path) -> Non
         session (Session): The active SQLAlchemy session.
         report_id (int): The ID of the report.
         pdf_path: The file path where the PDF will be saved.
+
+    Returns:
+        bool: True if the PDF was written, False if the report was not found, in which
+        case nothing is written to pdf_path.
     """
 
-    report_data = get_report(session, report_id)
-    if not report_data:
+    report_date = session.scalar(select(Report.date).where(Report.id == report_id))
+    if report_date is None:
         logger.error(f"Report with ID {report_id} not found.")
-        return
-
-    gen_records = (
-        session.query(GeneratedReport)
-        .filter(GeneratedReport.report_id == report_id)
-        .all()
-    )
-    pdf_filename = str(pdf_path)
-    doc = SimpleDocTemplate(pdf_filename, pagesize=A4)
-    styles = getSampleStyleSheet()
-
-    # Define styles
-    title_style = ParagraphStyle(
-        "TitleStyle",
-        parent=styles["Title"],
-        fontSize=18,
-        alignment=1,
-        textColor=colors.darkblue,
-        spaceAfter=16,
-    )
+        return False
 
-    subtitle_style = ParagraphStyle(
-        "SubtitleStyle",
-        parent=styles["Heading2"],
-        fontSize=14,
-        alignment=1,
-        textColor=colors.black,
-        spaceAfter=12,
+    record_count = session.scalar(
+        select(func.count())
+        .select_from(GeneratedReport)
+        .where(GeneratedReport.report_id == report_id)
     )
-
-    normal_style = styles["Normal"]
+    doc = StreamingDocTemplate(os.fspath(pdf_path), pagesize=A4)
 
     elements = []
 
     # === Main Page ===
-    elements.append(Paragraph("Audit Report", title_style))
+    elements.append(Paragraph("Audit Report", _TITLE_STYLE))
     elements.append(Spacer(1, 10))
 
     # Report Metadata Table
     metadata_table = Table(
         [
-            ["Report Date:", report_data.get("date")],
-            ["Total Findings:", len(gen_records)],
+            ["Report Date:", str(report_date)],
+            ["Total Findings:", record_count],
         ],
         colWidths=[120, 300],
     )
 
-    metadata_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("PADDING", (0, 0), (-1, -1), 6),
-            ]
-        )
-    )
+    metadata_table.setStyle(_METADATA_TABLE_STYLE)
 
     elements.append(metadata_table)
     elements.append(Spacer(1, 20))
 
     # Separator Line
-    elements.append(Paragraph("<hr width='100%' color='black'/>", normal_style))
+    elements.append(_HR_PARAGRAPH)
     elements.append(Spacer(1, 10))
     elements.append(PageBreak())
 
+    doc.start()
+    doc.add_flowables(elements)
+
     # === Report Content ===
-    printed_lynis_ids = set()
+    sections = []
+    for title, description in _iter_report_sections(session, report_id):
+        # Add section to PDF; the texts of a batch are sanitized together
+        sections.append(title)
+        sections.append(description)
+        if len(sections) >= 2 * _RECORDS_PER_BATCH:
+            doc.add_flowables(_section_flowables(sections))
+            sections = []
 
-    for record in gen_records:
-        title = ""
-        description = ""
+    doc.add_flowables(_section_flowables(sections))
+    doc.finish()
+    logger.info(f"Audit Report PDF generated: {pdf_path}")
+    return True
 
-        if record.object_a_type.lower() == "openscap":
-            db_obj = (
-                session.query(OpenSCAP)
-                .filter(OpenSCAP.id == record.object_a_id)
-                .first()
-            )
-            if db_obj:
-                title = db_obj.title
-                description = db_obj.description or ""
-
-        elif record.object_a_type.lower() in ["detail", "suggestion"]:
-            db_obj = session.query(Lynis).filter(Lynis.id == record.object_a_id).first()
-            if db_obj:
-                lynis_id = db_obj.lynis_json_id
-                if lynis_id and lynis_id in printed_lynis_ids:
-                    continue
-                if lynis_id:
-                    printed_lynis_ids.add(lynis_id)
-
-                title = db_obj.service if db_obj.service else "Lynis Record"
-                if db_obj.field:
-                    title += f" ({db_obj.field})"
-
-                if record.object_a_type.lower() == "suggestion" and lynis_id:
-                    title = f"Suggestion {lynis_id}: {title}"
 
-                description = (
-                    db_obj.long_description
-                    if db_obj.long_description
-                    else (db_obj.desc or "")
-                )
+def _refuse_url_fetch(url: str, *args, **kwargs):
+    """WeasyPrint url_fetcher that loads nothing, so a report never fetches resources."""
+    raise ValueError(f"Refusing to fetch {url} while rendering an Audit Report.")
 
-        else:
-            title = f"Unknown Type ({record.object_a_type})"
-            description = ""
 
-        # Sanitize the text
-        title = sanitize_text(title)
-        description = sanitize_text(description)
+def generate_audit_report_pdf_html(session: Session, report_id: int, pdf_path) -> bool:
+    """
+    Generates the same Audit Report as generate_audit_report_pdf, but renders it as HTML
+    and lays it out with WeasyPrint instead of ReportLab. Titles and descriptions are
+    HTML-escaped rather than rendered as markup: their <br> tags are turned into
+    newlines by sanitize_text first, and kept as line breaks by the stylesheet.
+
+    Args:
+        session (Session): The active SQLAlchemy session.
+        report_id (int): The ID of the report.
+        pdf_path: The file path where the PDF will be saved.
+
+    Returns:
+        bool: True if the PDF was written, False if the report was not found.
+    """
+    # WeasyPrint is optional, and importing it fails without its Pango libraries.
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as e:
+        raise ImportError(
+            "generate_audit_report_pdf_html requires WeasyPrint (pip install weasyprint)."
+        ) from e
+
+    report_date = session.scalar(select(Report.date).where(Report.id == report_id))
+    if report_date is None:
+        logger.error(f"Report with ID {report_id} not found.")
+        return False
+
+    record_count = session.scalar(
+        select(func.count())
+        .select_from(GeneratedReport)
+        .where(GeneratedReport.report_id == report_id)
+    )
+    html = _HTML_TEMPLATE.render(
+        date=str(report_date),
+        record_count=record_count,
+        sections=(
+            (sanitize_text(title), sanitize_text(description))
+            for title, description in _iter_report_sections(session, report_id)
+        ),
+    )
+    HTML(string=html, url_fetcher=_refuse_url_fetch).write_pdf(os.fspath(pdf_path))
+    logger.info(f"Audit Report PDF generated: {pdf_path}")
+    return True
+
+
+# Session factory of a generate_many worker process, set by _init_pdf_worker.
+_worker_session_factory = None
+
+
+def _init_pdf_worker(database_url: Optional[str]) -> None:
+    """
+    Sets up the session factory of a worker process. Without a database_url, the
+    module-level engine is reused after dropping connections inherited from the parent.
+    """
+    global _worker_session_factory
+    if database_url is None:
+        engine.dispose(close=False)
+        _worker_session_factory = SessionLocal
+    else:
+        _worker_session_factory = sessionmaker(
+            bind=create_engine(database_url), autoflush=False, autocommit=False
+        )
 
-        # Add section to PDF
-        elements.append(Paragraph(title, subtitle_style))
-        elements.append(Paragraph(description, normal_style))
-        elements.append(Spacer(1, 12))
 
-    doc.build(elements)
-    logger.info(f"Audit Report PDF generated: {pdf_filename}")
+def _generate_pdf_in_worker(report_id: int, pdf_path: Path) -> Optional[Path]:
+    with _worker_session_factory() as session:
+        generated = generate_audit_report_pdf(session, report_id, pdf_path)
+    return pdf_path if generated else None
+
+
+def generate_many(
+    report_ids: Iterable[int],
+    out_dir,
+    max_workers: Optional[int] = None,
+    database_url: Optional[str] = None,
+) -> List[Path]:
+    """
+    Generates an Audit Report PDF for each report_id in parallel worker processes.
+
+    ReportLab layout is pure Python, so reports are rendered in separate processes rather
+    than threads. Sessions cannot be shared with the workers, and neither can a
+    sessionmaker (its engine is not picklable), so there is no session_factory parameter:
+    each worker opens its own sessions, on the module-level engine by default or on an
+    engine created from database_url.
+
+    Args:
+        report_ids (Iterable[int]): The IDs of the reports.
+        out_dir: Directory where the PDFs are saved as Audit_Report_<report_id>.pdf.
+        max_workers (int, optional): Number of worker processes; defaults to the CPU count.
+        database_url (str, optional): Database the workers read the reports from;
+            defaults to DATABASE_URL.
+
+    Returns:
+        List[Path]: Paths of the PDFs written by this call. Reports that were not found
+        are skipped, and an existing file at their path is neither removed nor returned.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_pdf_worker,
+        initargs=(database_url,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _generate_pdf_in_worker,
+                report_id,
+                out_dir / f"Audit_Report_{report_id}.pdf",
+            )
+            for report_id in report_ids
+        ]
+        pdf_paths = [future.result() for future in futures]
+    return [pdf_path for pdf_path in pdf_paths if pdf_path is not None]
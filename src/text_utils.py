@@ -7,7 +7,7 @@ def create_text_for_openscap(rule: OpenSCAPRule) -> str:
     Builds a string from the OpenSCAPRule fields.
     """
     text = f"{rule.title} {rule.description} {rule.rationale}"
-    logger.debug(f"[create_text_for_openscap] {text}")
+    logger.opt(lazy=True).debug("[create_text_for_openscap] {}", lambda: text)
     return text
 
 
@@ -15,20 +15,10 @@ def create_text_for_detail(detail: DetailItemLynis) -> str:
     """
     Builds a string from the DetailItemLynis fields, including nested DescriptionLynis if present.
     """
-    parts = []
-    if detail.service:
-        parts.append(detail.service)
-    if detail.description:
-        if detail.description.desc:
-            parts.append(detail.description.desc)
-        if detail.description.value:
-            parts.append(detail.description.value)
-        if detail.description.field:
-            parts.append(detail.description.field)
-        if detail.description.prefval:
-            parts.append(detail.description.prefval)
-    text = " ".join(parts)
-    logger.debug(f"[create_text_for_detail] {text}")
+    desc = detail.description
+    nested = (desc.desc, desc.value, desc.field, desc.prefval) if desc else ()
+    text = " ".join(filter(None, (detail.service, *nested)))
+    logger.opt(lazy=True).debug("[create_text_for_detail] {}", lambda: text)
     return text
 
 
@@ -36,11 +26,7 @@ def create_text_for_suggestion(sugg: SuggestionItemLynis) -> str:
     """
     Builds a string from the SuggestionItemLynis fields.
     """
-    parts = [sugg.id or ""]
-    if sugg.severity:
-        parts.append(sugg.severity)
-    if sugg.description:
-        parts.append(sugg.description)
-    text = " ".join(parts)
-    logger.debug(f"[create_text_for_suggestion] {text}")
+    # The id is always the first part, even when empty.
+    text = " ".join((sugg.id or "", *filter(None, (sugg.severity, sugg.description))))
+    logger.opt(lazy=True).debug("[create_text_for_suggestion] {}", lambda: text)
     return text